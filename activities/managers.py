@@ -1,5 +1,6 @@
 from activities.constants import Action
 from django.contrib.contenttypes.models import ContentType
+from django.db.models import Prefetch
 from django.db.models.query_utils import Q
 from django_core.db.models import CommonManager
 
@@ -11,6 +12,15 @@ from django_core.db.models.managers import GenericManager
 class ActivityManager(CommonManager):
     """Manager for Activity model."""
 
+    def get_queryset(self):
+        """The ``created_user`` and ``about_content_type`` are used when
+        rendering almost every activity so fetch them in the same query.
+        """
+        return super(ActivityManager, self).get_queryset().select_related(
+            'created_user',
+            'about_content_type'
+        )
+
     def create(self, created_user, text=None, about=None,
                source=Source.SYSTEM, action=Action.CREATED,
                ensure_for_objs=None, exclude_objs=None, **kwargs):
@@ -94,6 +104,75 @@ class ActivityManager(CommonManager):
         activity.for_objs.add(*for_objs)
         return activity
 
+    def with_for_objects(self, queryset=None):
+        """Prefetches the ``for_objs`` for the activities with a single query
+        so ``get_for_objects()`` doesn't query for them per activity.
+
+        :param queryset: the activity queryset to prefetch the for objects for.
+            Defaults to all activities.
+        """
+        if queryset is None:
+            queryset = self.all()
+
+        return queryset.prefetch_related('for_objs')
+
+    def prefetch_for_objects(self, activities):
+        """Fetches the actual objects the activities are for with one query
+        per content type for all of the activities instead of per activity.
+        The objects are cached on each activity so ``get_for_objects()``
+        doesn't query for them.
+
+        The ``for_objs`` should be prefetched (see ``with_for_objects``) or
+        they will be queried for each activity.
+
+        :param activities: iterable of activities (i.e. a page of activities).
+        :return: the list of activities.
+        """
+        activities = list(activities)
+        for_objs_by_activity = [(activity, list(activity.for_objs.all()))
+                                for activity in activities]
+        for_model = self.model._get_many_to_many_model(field_name='for_objs')
+        content_objects = for_model.objects.get_content_objects(
+            for_obj
+            for activity, for_objs in for_objs_by_activity
+            for for_obj in for_objs
+        )
+
+        # the content objects are in the same order as the for_objs so split
+        # them back out per activity.
+        index = 0
+
+        for activity, for_objs in for_objs_by_activity:
+            next_index = index + len(for_objs)
+            activity._for_objects = content_objects[index:next_index]
+            index = next_index
+
+        return activities
+
+    def with_replies(self, queryset=None):
+        """Prefetches the replies for the activities with a single query.
+
+        Only the reply fields needed to render the replies are loaded.  If a
+        custom queryset is passed that uses ``only(...)`` for the replies, it
+        must include the ``activity`` field or the replies can't be joined
+        back to their activities which results in a query per reply.
+
+        :param queryset: the activity queryset to prefetch the replies for.
+            Defaults to all activities.
+        """
+        if queryset is None:
+            queryset = self.all()
+
+        reply_model = self.model._meta.get_field('replies').related_model
+        replies_queryset = reply_model.objects.select_related(
+            'created_user'
+        ).only('id', 'activity', 'reply_to', 'text', 'created_user',
+               'created_dttm')
+
+        return queryset.prefetch_related(
+            Prefetch('replies', queryset=replies_queryset)
+        )
+
     def get_about_object(self, about, **kwargs):
         """Gets all activities about the "about" object."""
         content_type = ContentType.objects.get_for_model(about)
@@ -239,6 +318,39 @@ class ActivityReplyManager(CommonManager):
 class ActivityForManager(GenericManager, CommonManager):
     """Model manager for the ActivityFor model."""
 
+    def get_content_objects(self, for_objs):
+        """Gets the actual objects for ActivityFor instances.  The objects are
+        fetched with one query per content type.
+
+        :param for_objs: iterable of ActivityFor instances.
+        :return: list of the content objects in the same order as the
+            ``for_objs``.  If a content object no longer exists, None is in
+            it's place.
+        """
+        for_objs = list(for_objs)
+        object_ids_by_content_type_id = {}
+
+        # group the object ids by content type
+        for for_obj in for_objs:
+            object_ids_by_content_type_id.setdefault(
+                for_obj.content_type_id, set()
+            ).add(for_obj.object_id)
+
+        objs_by_key = {}
+
+        for content_type_id, object_ids in object_ids_by_content_type_id.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+
+            # use the base manager, the same as the generic foreign key does,
+            # so a filtering default manager doesn't drop objects
+            objs = model._base_manager.in_bulk(list(object_ids))
+
+            for obj_id, obj in objs.items():
+                objs_by_key[(content_type_id, obj_id)] = obj
+
+        return [objs_by_key.get((for_obj.content_type_id, for_obj.object_id))
+                for for_obj in for_objs]
+
     def get_for_object(self, obj, **kwargs):
         """Gets instance for the obj.
 
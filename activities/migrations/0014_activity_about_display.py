@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0013_auto_20160301_1930'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='about_display',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+    ]
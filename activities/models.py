@@ -1,8 +1,12 @@
+from functools import lru_cache
+
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db import transaction
 from django.db.models import F
 from django.db.models.deletion import SET_NULL
+from django.db.models.signals import m2m_changed
 from django.db.models.signals import post_delete
 from django.db.models.signals import post_save
 from django.utils.translation import ugettext as _
@@ -18,6 +22,19 @@ from .managers import ActivityManager
 from .managers import ActivityReplyManager
 
 
+# lowercase human readable display text for each action keyed by the action
+# value
+_ACTION_DISPLAY_LOWER = {action: display.lower()
+                         for action, display in Action.CHOICES}
+
+
+@lru_cache(maxsize=None)
+def _verbose_name_for_content_type(content_type_id):
+    """Gets the model verbose name for a content type id."""
+    content_type = ContentType.objects.get_for_id(content_type_id)
+    return content_type.model_class()._meta.verbose_name
+
+
 class AbstractActivity(AbstractBaseModel):
     """Abstract extensible model for Activities.
 
@@ -32,7 +49,8 @@ class AbstractActivity(AbstractBaseModel):
         ``CREATED`` then I can construct the text as follows:
 
             ``Car object`` was ``created`` by ``created_user``
-    * replies: list of replies to this activity
+    * replies: the replies to this activity.  This is the reverse relation of
+        the ``ActivityReply.activity`` foreign key.
     * for_objs: list of docs this activity is for. For example,
         if a comment is made on a object "A" which has an object "B", then this
         list will include references to the::
@@ -54,12 +72,15 @@ class AbstractActivity(AbstractBaseModel):
         reference when listing out activities instead of listing 100 out
         individually.
     * reply_count: the denormalized number of replies to this activity
+    * about_display: the denormalized string representation of the "about"
+        object.  This is set when the activity is saved.
     """
     text = models.TextField(blank=True, null=True)
     about = GenericForeignKey(ct_field='about_content_type',
                               fk_field='about_id')
     about_content_type = models.ForeignKey(ContentType, null=True, blank=True)
     about_id = models.PositiveIntegerField(null=True, blank=True)
+    about_display = models.CharField(max_length=200, blank=True)
     reply_count = models.IntegerField(default=0)
     for_objs = models.ManyToManyField('ActivityFor',
                                       related_name='for_objs',
@@ -76,6 +97,49 @@ class AbstractActivity(AbstractBaseModel):
     class Meta:
         abstract = True
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(AbstractActivity, cls).from_db(db, field_names,
+                                                        values)
+        # remember the saved "about" object so save() knows if it changed.
+        # This reads the instance dict so deferred fields aren't loaded.
+        instance._saved_about_key = (
+            instance.__dict__.get('about_content_type_id'),
+            instance.__dict__.get('about_id')
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Denormalizes the "about" object's display value so the activity
+        text can be constructed without fetching the "about" object.  The value
+        is only refreshed when the "about" object changed or when the "about"
+        fields are being saved with ``update_fields``.
+        """
+        about_key = (self.about_content_type_id, self.about_id)
+        update_fields = kwargs.get('update_fields')
+
+        if update_fields is None:
+            is_about_changed = (about_key !=
+                                self.__dict__.get('_saved_about_key'))
+        else:
+            about_fields = set(['about_display', 'about_id',
+                                'about_content_type', 'about_content_type_id'])
+            is_about_changed = bool(about_fields.intersection(update_fields))
+
+            if is_about_changed:
+                kwargs['update_fields'] = set(update_fields)
+                kwargs['update_fields'].add('about_display')
+
+        if is_about_changed:
+            about = self.about if self.about_content_type_id else None
+            self.about_display = str(about)[:200] if about is not None else ''
+            # the cached absolute url can depend on the "about" object
+            self.__dict__.pop('_absolute_url', None)
+
+        saved = super(AbstractActivity, self).save(*args, **kwargs)
+        self._saved_about_key = about_key
+        return saved
+
     def is_comment(self):
         """Boolean indicating if the activity type is a comment."""
         return self.action == Action.COMMENTED
@@ -96,16 +160,52 @@ class AbstractActivity(AbstractBaseModel):
         :param reply_to: is a reply to a specific reply.
 
         """
-        reply = self.replies.create(created_user=user,
-                                    last_modified_user=user,
-                                    text=text,
-                                    reply_to=reply_to,
-                                    activity=self)
+        # the reply insert and the reply_count update in the post_save signal
+        # happen together.  The reply's activity is this instance so using
+        # reply.activity won't query for the activity.
+        with transaction.atomic():
+            reply = self.replies.model.objects.create(created_user=user,
+                                                      last_modified_user=user,
+                                                      text=text,
+                                                      reply_to=reply_to,
+                                                      activity=self)
         # TODO: If the user isn't part of the for_objs they should be added
         #       because they are not part of the conversation?
         # self.activityfor_set.get_or_create_generic(content_object=user)
         return reply
 
+    def add_replies(self, replies):
+        """Adds multiple replies to a Activity with bulk inserts instead of one
+        insert per reply.  Since ``bulk_create`` doesn't fire the ``post_save``
+        signal, the ``reply_count`` is incremented here with a single update.
+
+        :param replies: iterable of dicts with the ``user``, ``text`` and
+            optional ``reply_to`` keys.  These are the same as the
+            ``add_reply`` arguments.
+        :return: the list of replies created.  Depending on the database
+            backend, the replies may not have their primary keys set.
+
+        """
+        reply_model = self.replies.model
+        activity_replies = [reply_model(created_user=reply['user'],
+                                        last_modified_user=reply['user'],
+                                        text=reply['text'],
+                                        reply_to=reply.get('reply_to'),
+                                        activity=self)
+                            for reply in replies]
+
+        if not activity_replies:
+            return activity_replies
+
+        with transaction.atomic():
+            reply_model.objects.bulk_create(activity_replies, batch_size=500)
+            type(self).objects.filter(id=self.id).update(
+                reply_count=F('reply_count') + len(activity_replies)
+            )
+
+        self.reply_count += len(activity_replies)
+        return activity_replies
+
     def get_shared_action_display_text(self):
         """Get the display text used for the "shared" action in case the system
         wants different working (i.e. "reposted" instead of "shared").
@@ -131,7 +231,7 @@ class AbstractActivity(AbstractBaseModel):
         if hasattr(self.about, 'get_activity_action_html') and force != True:
             return self.about.get_activity_action_html(self, **kwargs)
 
-        object_name = self.about_content_type.model_class()._meta.verbose_name
+        object_name = _verbose_name_for_content_type(self.about_content_type_id)
         object_ref = object_name
         # these are common words that require "an" in the action text
         an_words = ['album', 'audio', 'image']
@@ -167,7 +267,8 @@ class AbstractActivity(AbstractBaseModel):
         if self.text:
             return self.text
 
-        action = Action.get_display(self.action) or self.action
+        action = (_ACTION_DISPLAY_LOWER.get(self.action) or
+                  self.action.lower())
 
         if self.action == Action.COMMENTED:
             template = '{created_user} {action} on the {object_name} {object}'
@@ -178,9 +279,11 @@ class AbstractActivity(AbstractBaseModel):
         #       activity.
         return template.format(
             created_user=self.created_user.username,
-            action=action.lower(),
-            object_name=self.about_content_type.model_class()._meta.verbose_name,
-            object=self.about
+            action=action,
+            object_name=_verbose_name_for_content_type(
+                self.about_content_type_id
+            ),
+            object=self.about_display or self.about
         )
 
     def get_html(self, auth_user=None, **kwargs):
@@ -207,7 +310,8 @@ class AbstractActivity(AbstractBaseModel):
             html_func = getattr(self.about, activity_html_func_name)
             return html_func(self, auth_user=auth_user, **kwargs)
 
-        action = Action.get_display(self.action) or self.action
+        action = (_ACTION_DISPLAY_LOWER.get(self.action) or
+                  self.action.lower())
 
         created_user = self.created_user
 
@@ -239,16 +343,45 @@ class AbstractActivity(AbstractBaseModel):
         #       activity.
         return template.format(
             created_user=created_user,
-            action=action.lower(),
-            object_name=self.about_content_type.model_class()._meta.verbose_name,
+            action=action,
+            object_name=_verbose_name_for_content_type(
+                self.about_content_type_id
+            ),
             object=about
         )
 
     def get_for_objects(self):
-        """Gets the actual objects the activity is for."""
-        return [obj.content_object
-                for obj in self.for_objs.all().prefetch_related(
-                                                            'content_object')]
+        """Gets the actual objects the activity is for.
+
+        The objects are fetched with one query per content type instead of one
+        query per ``for_obj``.  The ``for_objs`` can be prefetched for a
+        queryset of activities using ``Activity.objects.with_for_objects()``
+        and the objects for a page of activities can be fetched together using
+        ``Activity.objects.prefetch_for_objects()``.
+
+        The objects are cached on the instance since templates can call this
+        several times when rendering an activity.  The cache is cleared when
+        the ``for_objs`` are changed through this instance (see
+        ``for_objs_changed``).
+        """
+        for_objects = self.__dict__.get('_for_objects')
+
+        if for_objects is not None:
+            return for_objects
+
+        for_model = self.for_objs.model
+        self._for_objects = for_model.objects.get_content_objects(
+            self.for_objs.all()
+        )
+        return self._for_objects
+
+    @classmethod
+    def for_objs_changed(cls, sender, instance, action, **kwargs):
+        """m2m_changed signal that clears the cached ``get_for_objects()``
+        objects when the ``for_objs`` change.
+        """
+        if action.startswith('post_'):
+            instance.__dict__.pop('_for_objects', None)
 
     def get_reply_by_id(self, reply_id):
         """Gets the reply for a activity by it's id."""
@@ -257,9 +390,14 @@ class AbstractActivity(AbstractBaseModel):
     def delete_reply(self, reply_id):
         """Delete an individual activity reply.
 
-        :param activity_id: ID of the activity reply to delete
+        :param reply_id: ID of the activity reply to delete
 
         """
+        # The related manager scopes the delete by activity id and reply id.
+        # This intentionally uses the collector delete (a select of the reply,
+        # a cascade check for replies to it and then the delete) instead of a
+        # raw single statement delete since the post_delete signal maintains
+        # the reply_count and replies to this reply need to be cascaded.
         self.replies.filter(id=reply_id).delete()
         return True
 
@@ -276,10 +414,24 @@ class Activity(AbstractUrlLinkModelMixin, AbstractActivity):
         )
 
     def get_absolute_url(self):
+        """The absolute url is cached on the instance since it's rendered
+        several times per activity and can require fetching the "about" object.
+        """
+        absolute_url = self.__dict__.get('_absolute_url')
+
+        if absolute_url is not None:
+            return absolute_url
+
         if self.about and hasattr(self.about, 'get_activities_url'):
-            return '{0}/{1}'.format(self.about.get_activities_url(), self.id)
+            absolute_url = '{0}/{1}'.format(self.about.get_activities_url(),
+                                            self.id)
+        else:
+            absolute_url = '/activities/{0}'.format(self.id)
+
+        if self.id is not None:
+            self._absolute_url = absolute_url
 
-        return '/activities/{0}'.format(self.id)
+        return absolute_url
 
     def get_edit_url(self):
         return '{0}/edit'.format(self.get_absolute_url())
@@ -322,6 +474,8 @@ class Activity(AbstractUrlLinkModelMixin, AbstractActivity):
 
 post_save.connect(Activity.post_save, sender=Activity)
 post_delete.connect(Activity.post_delete, sender=Activity)
+m2m_changed.connect(Activity.for_objs_changed,
+                    sender=Activity.for_objs.through)
 
 
 class ActivityReply(AbstractUrlLinkModelMixin, AbstractBaseModel):
@@ -343,11 +497,28 @@ class ActivityReply(AbstractUrlLinkModelMixin, AbstractBaseModel):
     objects = ActivityReplyManager()
 
     class Meta:
+        # activity is the leading column so this index also serves the reply
+        # lookups filtered by activity alone (get_reply_by_id, delete_reply).
         index_together = (('activity', 'created_dttm'),)
 
     def get_absolute_url(self):
-        return '{0}/replies/{1}'.format(self.activity.get_absolute_url(),
-                                        self.id)
+        """The absolute url is cached on the instance since it's rendered
+        several times per reply.
+        """
+        absolute_url = self.__dict__.get('_absolute_url')
+
+        if absolute_url is not None:
+            return absolute_url
+
+        absolute_url = '{0}/replies/{1}'.format(
+            self.activity.get_absolute_url(),
+            self.id
+        )
+
+        if self.id is not None:
+            self._absolute_url = absolute_url
+
+        return absolute_url
 
     def get_edit_url(self):
         return '{0}/edit'.format(self.get_absolute_url())
@@ -1,4 +1,12 @@
+from functools import lru_cache
+from operator import methodcaller
+
 from activities.constants import Action
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.template import Library
 from django.template.loader import render_to_string
 from django.utils.html import escape
@@ -9,6 +17,65 @@ from django_core.utils.loading import get_function_from_settings
 
 register = Library()
 
+# form renderers that can be referenced by name in the
+# ``ACTIVITIES_FORM_RENDERER`` setting.
+_FORM_METHOD_RENDERERS = {
+    'as_p': methodcaller('as_p'),
+    'as_table': methodcaller('as_table'),
+    'as_ul': methodcaller('as_ul'),
+}
+
+
+@lru_cache(maxsize=1)
+def _get_form_renderer():
+    """Gets the form rendering function for the ``ACTIVITIES_FORM_RENDERER``
+    setting.  This is resolved once and cached since the setting is read on
+    every form render.
+    """
+    renderer_name = getattr(settings, 'ACTIVITIES_FORM_RENDERER', None)
+
+    if not renderer_name:
+        return None
+
+    if renderer_name in _FORM_METHOD_RENDERERS:
+        return _FORM_METHOD_RENDERERS[renderer_name]
+
+    return get_function_from_settings('ACTIVITIES_FORM_RENDERER')
+
+
+@lru_cache(maxsize=1)
+def _get_render_cache_timeout():
+    """Gets the ``ACTIVITIES_RENDER_CACHE_TIMEOUT`` setting.  This is cached
+    since the setting is read every time an activity is rendered.
+    """
+    return getattr(settings, 'ACTIVITIES_RENDER_CACHE_TIMEOUT', None)
+
+
+@receiver(setting_changed)
+def _clear_settings_cache(setting, **kwargs):
+    """Clears the cached setting values when the settings change."""
+    if setting == 'ACTIVITIES_FORM_RENDERER':
+        _get_form_renderer.cache_clear()
+    elif setting == 'ACTIVITIES_RENDER_CACHE_TIMEOUT':
+        _get_render_cache_timeout.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def _get_snippet_template(engine, template_name):
+    """Gets the compiled snippet template for a template engine.  This is
+    cached so the snippet isn't loaded and parsed every time it's rendered.
+    """
+    return engine.get_template(template_name)
+
+
+@receiver(setting_changed)
+def _clear_snippet_templates(setting, **kwargs):
+    """Clears the cached snippet templates when the template settings
+    change.
+    """
+    if setting.startswith('TEMPLATE'):
+        _get_snippet_template.cache_clear()
+
 
 @register.simple_tag(takes_context=True)
 def render_activities(context, page, obj, activity_url, activity_source=None,
@@ -34,28 +101,118 @@ def render_activities(context, page, obj, activity_url, activity_source=None,
         'is_infinite_scroll': is_infinite_scroll
     })
 
-    context.update(kwargs)
-
     if activity_source is not None:
-        context['activity_source'] = activity_source
+        kwargs['activity_source'] = activity_source
 
-    return render_to_string('activities/snippets/activities.html',
-                            context=context)
+    with context.push(**kwargs):
+        return render_snippet(
+            context=context,
+            template_name='activities/snippets/activities.html'
+        )
 
 
 @register.simple_tag(takes_context=True)
 def render_activity(context, activity, activity_url, show_reference_obj=False,
                     **kwargs):
-    """Renders an activity to html."""
+    """Renders an activity to html.
+
+    If the ``ACTIVITIES_RENDER_CACHE_TIMEOUT`` setting is set, the rendered
+    html is cached for that many seconds.  The cached html is specific to the
+    activity's last modified datetime and reply count, the user viewing the
+    activity and the request it's rendered for (see
+    ``get_activity_cache_key``).
+    """
     kwargs.update({
         'activity': activity,
         'show_reference_obj': show_reference_obj,
         'activity_url': activity_url
     })
-    context.update(kwargs)
+    timeout = _get_render_cache_timeout()
+
+    with context.push(**kwargs):
+        if not timeout:
+            return render_snippet(
+                context=context,
+                template_name='activities/snippets/activity.html'
+            )
+
+        cache_key = get_activity_cache_key(context=context, activity=activity)
+        html = cache.get(cache_key)
+
+        if html is None:
+            html = render_snippet(
+                context=context,
+                template_name='activities/snippets/activity.html'
+            )
+            cache.set(cache_key, html, timeout)
+
+        return html
+
+
+def render_snippet(context, template_name):
+    """Renders a snippet template with the template context of the calling
+    template tag.  The tag's variables should be pushed onto the context
+    before calling this so they are popped once the snippet is rendered
+    instead of remaining in the parent template's context.
+
+    :param context: the template context of the calling template tag.
+    :param template_name: the name of the snippet template to render.
+    """
+    engine = context.template.engine
 
-    return render_to_string('activities/snippets/activity.html',
-                            context=context)
+    if engine.debug:
+        # don't cache the template so changes show without a restart
+        template = engine.get_template(template_name)
+    else:
+        template = _get_snippet_template(engine, template_name)
+
+    return template.render(context)
+
+
+def get_activity_cache_key(context, activity):
+    """Gets the cache key for the rendered activity html.  The key varies on
+    everything in the context the activity snippet renders differently for,
+    including the request specific values (the csrf token, the request path,
+    the page of replies and the user's shares).
+
+    :param context: the template context the activity is rendered with.
+    :param activity: the activity being rendered.
+    """
+    user = context.get('user')
+    request = context.get('request')
+    activity_replies = context.get('activity_replies')
+    shares_by_content_type = (
+        context.get('user_shared_objects_by_content_type') or {}
+    )
+    csrf_token = None
+
+    if (user is not None and user.is_authenticated() and
+        context.get('show_replies') != False):
+        # the reply form with the csrf token is only rendered for
+        # authenticated users when the replies are shown.  Otherwise, don't
+        # touch the lazy token since getting it sets the csrf cookie.
+        csrf_token = str(context.get('csrf_token', ''))
+
+    vary_on = [
+        activity.id,
+        activity.last_modified_dttm,
+        activity.reply_count,
+        user.id if user is not None else None,
+        csrf_token,
+        request.path if request is not None else None,
+        context.get('activity_url'),
+        context.get('show_reference_obj'),
+        context.get('show_replies'),
+        context.get('user_timezone'),
+        [reply.id for reply in activity_replies]
+        if activity_replies is not None else None,
+        context.get('activity_replies_next_url'),
+        context.get('activity_replies_has_more'),
+        activity.about_id in shares_by_content_type.get(
+            activity.about_content_type_id, ()
+        )
+    ]
+    return make_template_fragment_key('activity', vary_on)
 
 
 @register.simple_tag
@@ -132,17 +289,9 @@ def render_activity_form(form):
     This will default to rending the form to however the form's ``__str__``
     method is defined.
     """
-    renderer_func = get_function_from_settings('ACTIVITIES_FORM_RENDERER')
+    renderer_func = _get_form_renderer()
+
     if not renderer_func:
         return form
 
-    if renderer_func == 'as_table':
-        return form.as_table()
-
-    if renderer_func == 'as_ul':
-        return form.as_ul()
-
-    if renderer_func == 'as_p':
-        return form.as_p()
-
     return renderer_func(form)
@@ -6,6 +6,8 @@ from activities.constants import Source
 from django_testing.testcases.users import SingleUserTestCase
 from django_testing.user_utils import create_user
 from activities.constants import Privacy
+from activities.models import ActivityFor
+from test_models.models import ActivityAboutTestModel
 
 
 Activity = get_activity_model()
@@ -112,7 +114,9 @@ class ActivityTests(SingleUserTestCase):
         reply = n.add_reply(user=reply_user,
                             text=reply_text)
 
-        self.assertEqual(reply.activity, n)
+        with self.assertNumQueries(0):
+            self.assertEqual(reply.activity, n)
+
         self.assertEqual(reply.text, reply_text)
         self.assertEqual(reply.created_user, reply_user)
         self.assertEqual(reply.last_modified_user, reply_user)
@@ -121,6 +125,28 @@ class ActivityTests(SingleUserTestCase):
         self.assertEqual(len(replies), 1)
         self.assertEqual(replies[0], reply)
 
+    def test_add_replies(self):
+        """Test for adding multiple activity replies at once."""
+        n = Activity.objects.create(created_user=self.user,
+                                    text='Hello world',
+                                    about=create_user(),
+                                    action=Action.COMMENTED)
+        reply_user = create_user()
+
+        replies = n.add_replies([
+            {'user': reply_user, 'text': 'Some reply comment 1.'},
+            {'user': reply_user, 'text': 'Some reply comment 2.'}
+        ])
+
+        self.assertEqual(len(replies), 2)
+        self.assertEqual(n.reply_count, 2)
+        self.assertEqual(Activity.objects.get(id=n.id).reply_count, 2)
+
+        reply_texts = list(n.replies.values_list('text', flat=True))
+        self.assertEqual(len(reply_texts), 2)
+        self.assertTrue('Some reply comment 1.' in reply_texts)
+        self.assertTrue('Some reply comment 2.' in reply_texts)
+
     def test_get_for_objects(self):
         """Test getting the actual for objects."""
         text = 'Hello world'
@@ -137,6 +163,40 @@ class ActivityTests(SingleUserTestCase):
         self.assertTrue(about_obj in for_objects)
         self.assertTrue(self.user in for_objects)
 
+    def test_get_for_objects_cached(self):
+        """Test the for objects are only fetched once per activity instance."""
+        n = Activity.objects.create(created_user=self.user,
+                                    text='Hello world',
+                                    about=create_user(),
+                                    action=Action.COMMENTED,
+                                    ensure_for_objs=self.user)
+        for_objects = n.get_for_objects()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(n.get_for_objects(), for_objects)
+
+    def test_get_for_objects_cache_cleared(self):
+        """Test the cached for objects are cleared when the for_objs change."""
+        about_obj = create_user()
+        n = Activity.objects.create(created_user=self.user,
+                                    text='Hello world',
+                                    about=about_obj,
+                                    action=Action.COMMENTED)
+        self.assertEqual(n.get_for_objects(), [about_obj])
+
+        user_2 = create_user()
+        activity_for = ActivityFor.objects.get_or_create_generic(
+            content_object=user_2
+        )[0]
+        n.for_objs.add(activity_for)
+        for_objects = n.get_for_objects()
+
+        self.assertEqual(len(for_objects), 2)
+        self.assertTrue(user_2 in for_objects)
+
+        n.for_objs.remove(activity_for)
+        self.assertEqual(n.get_for_objects(), [about_obj])
+
     def test_get_reply_by_id(self):
         """Test for adding activity replies."""
         n = Activity.objects.create(created_user=self.user,
@@ -213,6 +273,42 @@ class ActivityTests(SingleUserTestCase):
         self.assertTrue(replies[1], reply2)
         self.assertTrue(replies[1].reply_to, reply1)
 
+    def test_get_absolute_url_cached(self):
+        """Test the absolute url is only built once per activity instance."""
+        n = Activity.objects.create(created_user=self.user,
+                                    text='Hello world',
+                                    about=create_user(),
+                                    action=Action.COMMENTED)
+        n = Activity.objects.get(id=n.id)
+        absolute_url = n.get_absolute_url()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(n.get_absolute_url(), absolute_url)
+            self.assertEqual(n.get_edit_url(),
+                             '{0}/edit'.format(absolute_url))
+
+    def test_get_absolute_url_about_changed(self):
+        """Test the cached absolute url is cleared when the "about" object
+        changes.
+        """
+        about_obj_1 = ActivityAboutTestModel.objects.create(name='about 1')
+        about_obj_2 = ActivityAboutTestModel.objects.create(name='about 2')
+        n = Activity.objects.create(created_user=self.user,
+                                    text='Hello world',
+                                    about=about_obj_1,
+                                    action=Action.COMMENTED)
+        self.assertEqual(n.get_absolute_url(),
+                         '/about/{0}/activities/{1}'.format(about_obj_1.id,
+                                                            n.id))
+
+        n.about = about_obj_2
+        n.save()
+
+        absolute_url = '/about/{0}/activities/{1}'.format(about_obj_2.id, n.id)
+        self.assertEqual(n.get_absolute_url(), absolute_url)
+        self.assertEqual(n.get_edit_url(), '{0}/edit'.format(absolute_url))
+        self.assertEqual(n.get_delete_url(), '{0}/delete'.format(absolute_url))
+
     def test_is_comment(self):
         """Test indicating if the activity is a comment."""
         n = Activity(action=Action.COMMENTED)
@@ -235,6 +331,65 @@ class ActivityTests(SingleUserTestCase):
                                     source=Source.USER)
         self.assertIsNotNone(n.get_text())
 
+    def test_get_activity_text_denormalized(self):
+        """Test the get_text method uses the denormalized "about" value
+        without fetching the "about" object.
+        """
+        about_obj = create_user()
+        n = Activity.objects.create(created_user=self.user,
+                                    about=about_obj,
+                                    action=Action.COMMENTED,
+                                    source=Source.USER)
+
+        self.assertEqual(n.about_display, str(about_obj))
+
+        n = Activity.objects.get(id=n.id)
+
+        with self.assertNumQueries(0):
+            text = n.get_text()
+
+        self.assertTrue(str(about_obj) in text)
+
+    def test_about_display_cleared(self):
+        """Test the denormalized "about" value is cleared when the "about"
+        object is removed.
+        """
+        n = Activity.objects.create(created_user=self.user,
+                                    about=create_user(),
+                                    action=Action.COMMENTED,
+                                    source=Source.USER)
+        n.about = None
+        n.save()
+
+        self.assertEqual(Activity.objects.get(id=n.id).about_display, '')
+
+    def test_about_display_not_refreshed(self):
+        """Test saving an activity without changing the "about" object doesn't
+        fetch the "about" object.
+        """
+        about_obj = create_user()
+        n = Activity.objects.create(created_user=self.user,
+                                    about=about_obj,
+                                    action=Action.COMMENTED,
+                                    source=Source.USER)
+        n = Activity.objects.get(id=n.id)
+
+        with self.assertNumQueries(1):
+            n.privacy = Privacy.PUBLIC
+            n.save(update_fields=['privacy'])
+
+        with self.assertNumQueries(1):
+            n.save()
+
+        self.assertEqual(n.about_display, str(about_obj))
+
+        about_obj_2 = create_user()
+        n.about = about_obj_2
+        n.save(update_fields=['about_id', 'about_content_type'])
+
+        self.assertEqual(Activity.objects.get(id=n.id).about_display,
+                         str(about_obj_2))
+
     def test_get_activity_html(self):
         """Test the get_activity_html method to ensure it properly creates the
         expected text.
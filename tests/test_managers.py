@@ -2,6 +2,7 @@ from activities.constants import Action
 from activities.constants import Privacy
 from activities.constants import Source
 from activities.models import Activity
+from activities.models import ActivityFor
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
@@ -259,3 +260,98 @@ class ActivityManagerTests(TestCase):
         for index, activity in enumerate(list(activities)):
             self.assertEqual(activity.privacy, Privacy.PUBLIC,
                              'Error index {0}'.format(index))
+
+    def test_with_replies(self):
+        """Test the replies are prefetched with a single query."""
+        user_1 = create_user()
+        activity_ids = []
+
+        for i in range(3):
+            activity = create_activity(created_user=self.user, about=user_1)
+            activity.add_reply(user=user_1, text='reply 1')
+            activity.add_reply(user=user_1, text='reply 2')
+            activity_ids.append(activity.id)
+
+        queryset = Activity.objects.with_replies(
+            Activity.objects.filter(id__in=activity_ids)
+        )
+
+        with self.assertNumQueries(2):
+            for activity in queryset:
+                replies = list(activity.replies.all())
+                self.assertEqual(len(replies), 2)
+
+                for reply in replies:
+                    self.assertEqual(reply.created_user, user_1)
+                    self.assertEqual(reply.activity_id, activity.id)
+
+    def test_with_for_objects(self):
+        """Test the for objects are prefetched and their content objects are
+        fetched with a query per content type.
+        """
+        user_1 = create_user()
+        user_2 = create_user()
+        activity_ids = []
+
+        for i in range(3):
+            activity = create_activity(created_user=self.user, about=user_1,
+                                       ensure_for_objs=[user_2])
+            activity_ids.append(activity.id)
+
+        queryset = Activity.objects.with_for_objects(
+            Activity.objects.filter(id__in=activity_ids)
+        )
+
+        with self.assertNumQueries(2):
+            activities = list(queryset)
+            for_objs = [for_obj for activity in activities
+                        for for_obj in activity.for_objs.all()]
+
+        self.assertEqual(len(for_objs), 6)
+
+        with self.assertNumQueries(1):
+            content_objects = ActivityFor.objects.get_content_objects(for_objs)
+
+        self.assertEqual(len(content_objects), 6)
+        self.assertTrue(user_1 in content_objects)
+        self.assertTrue(user_2 in content_objects)
+
+        # get_for_objects reuses the prefetched for_objs and only queries for
+        # the users.
+        activity = Activity.objects.with_for_objects(
+            Activity.objects.filter(id=activity_ids[0])
+        )[0]
+
+        with self.assertNumQueries(1):
+            for_objects = activity.get_for_objects()
+
+        self.assertEqual(len(for_objects), 2)
+
+    def test_prefetch_for_objects(self):
+        """Test the for objects for a page of activities are fetched with a
+        query per content type for all the activities.
+        """
+        user_1 = create_user()
+        user_2 = create_user()
+        activity_ids = []
+
+        for i in range(3):
+            activity = create_activity(created_user=self.user, about=user_1,
+                                       ensure_for_objs=[user_2])
+            activity_ids.append(activity.id)
+
+        queryset = Activity.objects.with_for_objects(
+            Activity.objects.filter(id__in=activity_ids)
+        )
+
+        with self.assertNumQueries(3):
+            activities = Activity.objects.prefetch_for_objects(queryset)
+
+        self.assertEqual(len(activities), 3)
+
+        with self.assertNumQueries(0):
+            for activity in activities:
+                for_objects = activity.get_for_objects()
+                self.assertEqual(len(for_objects), 2)
+                self.assertTrue(user_1 in for_objects)
+                self.assertTrue(user_2 in for_objects)
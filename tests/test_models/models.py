@@ -11,3 +11,14 @@ class AbstractActivityMixin(models.Model):
 
     def my_test_method(self):
         return 'worked'
+
+
+class ActivityAboutTestModel(models.Model):
+    """Model that activities can be about that has it's own activities url."""
+    name = models.CharField(max_length=50)
+
+    def __str__(self):
+        return self.name
+
+    def get_activities_url(self):
+        return '/about/{0}/activities'.format(self.id)
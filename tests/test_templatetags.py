@@ -0,0 +1,275 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from activities.models import Activity
+from activities.templatetags.activity_tags import _get_snippet_template
+from activities.templatetags.activity_tags import get_activity_cache_key
+from activities.templatetags.activity_tags import render_activity_form
+from django import forms
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.template import Template
+from django.template.context import Context
+from django.template.context import RequestContext
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+from django_testing.user_utils import create_user
+
+from .utils import create_activity
+
+
+class TemplateTagTestForm(forms.Form):
+    text = forms.CharField()
+
+
+class RenderActivityFormTests(TestCase):
+    """Tests for the render_activity_form template filter."""
+
+    def test_render_activity_form_default(self):
+        """Test the form is returned as is when no renderer is set."""
+        form = TemplateTagTestForm()
+        self.assertEqual(render_activity_form(form), form)
+
+    def test_render_activity_form_setting_changed(self):
+        """Test the renderer is updated when the setting changes."""
+        form = TemplateTagTestForm()
+
+        with override_settings(ACTIVITIES_FORM_RENDERER='as_p'):
+            self.assertEqual(render_activity_form(form), form.as_p())
+
+        with override_settings(ACTIVITIES_FORM_RENDERER='as_ul'):
+            self.assertEqual(render_activity_form(form), form.as_ul())
+
+        self.assertEqual(render_activity_form(form), form)
+
+
+class ActivityCacheKeyTests(TestCase):
+    """Tests for the rendered activity cache key."""
+
+    def test_get_activity_cache_key(self):
+        """Test the cache key changes when the activity or user changes."""
+        user = create_user()
+        activity = create_activity(about=user, created_user=user)
+        context = Context({'user': user})
+        cache_key = get_activity_cache_key(context=context, activity=activity)
+
+        self.assertEqual(cache_key, get_activity_cache_key(context=context,
+                                                           activity=activity))
+        self.assertNotEqual(
+            cache_key,
+            get_activity_cache_key(context=Context({'user': create_user()}),
+                                   activity=activity)
+        )
+
+        activity.last_modified_dttm += timedelta(seconds=1)
+        self.assertNotEqual(cache_key,
+                            get_activity_cache_key(context=context,
+                                                   activity=activity))
+
+
+@override_settings(ACTIVITIES_RENDER_CACHE_TIMEOUT=600)
+class RenderActivityCacheTests(TestCase):
+    """Tests for the cached render_activity template tag html."""
+
+    def setUp(self):
+        super(RenderActivityCacheTests, self).setUp()
+        cache.clear()
+
+    def render_activity(self, activity, user, path, activity_replies=None,
+                        request=None):
+        """Renders the activity for a request to the path."""
+        if request is None:
+            request = RequestFactory().get(path)
+            request.user = user
+
+        template = Template('{% load activity_tags %}'
+                            '{% render_activity activity=activity '
+                            'activity_url="/activities" %}')
+        return template.render(RequestContext(request, {
+            'activity': activity,
+            'activity_replies': activity_replies,
+            'user': user
+        }))
+
+    def test_render_activity_cached_per_request(self):
+        """Test the cached html isn't reused for a different request path or
+        page of replies.
+        """
+        user = create_user()
+        activity = create_activity(about=user, created_user=user)
+        reply_1 = activity.add_reply(user=user, text='First page reply')
+        reply_2 = activity.add_reply(user=user, text='Second page reply')
+
+        feed_html = self.render_activity(activity=activity, user=user,
+                                         path='/feed',
+                                         activity_replies=[reply_1])
+        activity_html = self.render_activity(activity=activity, user=user,
+                                             path='/activities/1',
+                                             activity_replies=[reply_1])
+        page_2_html = self.render_activity(activity=activity, user=user,
+                                           path='/activities/1',
+                                           activity_replies=[reply_2])
+
+        self.assertNotEqual(feed_html, activity_html)
+        self.assertTrue('value="/feed"' in feed_html)
+        self.assertTrue('value="/activities/1"' in activity_html)
+
+        self.assertNotEqual(activity_html, page_2_html)
+        self.assertTrue('First page reply' in activity_html)
+        self.assertTrue('Second page reply' in page_2_html)
+        self.assertFalse('First page reply' in page_2_html)
+
+    def test_render_activity_anonymous_csrf_cookie_not_used(self):
+        """Test rendering a cached activity for an anonymous user doesn't get
+        the csrf token which would set the csrf cookie.
+        """
+        user = create_user()
+        activity = create_activity(about=user, created_user=user)
+        request = RequestFactory().get('/feed')
+        request.user = AnonymousUser()
+
+        self.render_activity(activity=activity, user=request.user,
+                             path='/feed', request=request)
+
+        self.assertFalse(request.META.get('CSRF_COOKIE_USED', False))
+
+    def test_render_activity_cache_hit(self):
+        """Test rendering the same activity for the same request twice reuses
+        the cached html and that changing the reply count or last modified
+        datetime renders the activity again.
+        """
+        user = create_user()
+        activity = create_activity(about=user, created_user=user)
+        reply = activity.add_reply(user=user, text='Original reply')
+        html = self.render_activity(activity=activity, user=user,
+                                    path='/feed', activity_replies=[reply])
+
+        # the reply isn't part of the cache key so the cached html still has
+        # the original reply text.
+        reply.text = 'Changed reply'
+        cached_html = self.render_activity(activity=activity, user=user,
+                                           path='/feed',
+                                           activity_replies=[reply])
+
+        self.assertEqual(html, cached_html)
+        self.assertTrue('Original reply' in cached_html)
+
+        activity.reply_count += 1
+        reply_count_html = self.render_activity(activity=activity, user=user,
+                                                path='/feed',
+                                                activity_replies=[reply])
+
+        self.assertTrue('Changed reply' in reply_count_html)
+
+        reply.text = 'Changed reply again'
+        activity.last_modified_dttm += timedelta(seconds=1)
+        last_modified_html = self.render_activity(activity=activity,
+                                                  user=user,
+                                                  path='/feed',
+                                                  activity_replies=[reply])
+
+        self.assertTrue('Changed reply again' in last_modified_html)
+
+
+class RenderActivitiesContextTests(TestCase):
+    """Tests the template tag variables are only available to the rendered
+    snippets and aren't left in the parent template context.
+    """
+
+    def get_context(self, user, **kwargs):
+        request = RequestFactory().get('/feed')
+        request.user = user
+        return RequestContext(request, kwargs)
+
+    def test_render_activity_context(self):
+        """Test the render_activity variables don't leak into the parent
+        context.
+        """
+        user = create_user()
+        activity = create_activity(about=user, created_user=user)
+        template = Template('{% load activity_tags %}'
+                            '{% render_activity activity=activity '
+                            'activity_url="/foo/activities" %}'
+                            '[{{ activity_url }}]')
+        html = template.render(self.get_context(user=user,
+                                                activity=activity))
+
+        self.assertTrue('action="/foo/activities"' in html)
+        self.assertTrue(html.endswith('[]'))
+
+    def test_render_activities_context(self):
+        """Test the render_activities variables don't leak into the parent
+        context.
+        """
+        user = create_user()
+        create_activity(about=user, created_user=user)
+        page = Paginator(Activity.objects.get_about_object(about=user),
+                         10).page(1)
+        template = Template('{% load activity_tags %}'
+                            '{% render_activities page=page obj=user '
+                            'activity_url="/foo/activities" '
+                            'activity_source="USER" %}'
+                            '[{{ activity_url }}|{{ activity_source }}|'
+                            '{{ activities_page }}]')
+        html = template.render(self.get_context(user=user, page=page))
+
+        self.assertTrue('href="/foo/activities?aa=commented"' in html)
+        self.assertTrue(html.endswith('[||]'))
+
+
+class SnippetTemplateCacheTests(TestCase):
+    """Tests for the cached compiled snippet templates."""
+
+    def setUp(self):
+        super(SnippetTemplateCacheTests, self).setUp()
+        _get_snippet_template.cache_clear()
+        self.user = create_user()
+        self.activity = create_activity(about=self.user,
+                                        created_user=self.user)
+        self.template = Template('{% load activity_tags %}'
+                                 '{% render_activity activity=activity '
+                                 'activity_url="/activities" %}')
+
+    def render_activity(self):
+        request = RequestFactory().get('/feed')
+        request.user = self.user
+        return self.template.render(RequestContext(request, {
+            'activity': self.activity
+        }))
+
+    def test_snippet_template_cached(self):
+        """Test the snippet template is only loaded once."""
+        self.render_activity()
+        self.render_activity()
+
+        cache_info = _get_snippet_template.cache_info()
+        self.assertEqual(cache_info.misses, 1)
+        self.assertEqual(cache_info.hits, 1)
+
+    def test_snippet_template_not_cached_debug(self):
+        """Test the snippet template isn't cached when the template engine is
+        in debug mode.
+        """
+        with patch.object(self.template.engine, 'debug', True):
+            self.render_activity()
+            self.render_activity()
+
+        cache_info = _get_snippet_template.cache_info()
+        self.assertEqual(cache_info.misses, 0)
+        self.assertEqual(cache_info.hits, 0)
+        self.assertEqual(cache_info.currsize, 0)
+
+    def test_snippet_template_cache_cleared(self):
+        """Test the cached snippet templates are cleared when the template
+        settings change.
+        """
+        self.render_activity()
+        self.assertEqual(_get_snippet_template.cache_info().currsize, 1)
+
+        with override_settings(TEMPLATES=[{
+            'BACKEND': 'django.template.backends.django.DjangoTemplates',
+            'APP_DIRS': True
+        }]):
+            self.assertEqual(_get_snippet_template.cache_info().currsize, 0)